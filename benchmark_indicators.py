@@ -0,0 +1,154 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from indicators import DEFAULT_INDICATORS, calculate_indicators, batch_indicators
+
+# Universe size for the benchmark: ROWS candles (about two days of 5-minute bars) for SYMBOLS symbols
+ROWS = 600
+SYMBOLS = 200
+
+# Symbols start up to this many rows late to exercise ragged histories
+MAX_START = 150
+
+# Largest relative difference accepted between the batched kernels and pandas_ta
+TOLERANCE = 1e-8
+
+TARGET_SPEEDUP = 20
+
+# Reference outputs of pandas_ta for a small ragged universe, checked in so the kernels can be
+# verified without pandas_ta installed. Regenerate with: python benchmark_indicators.py --generate
+FIXTURE_FILE = 'indicators_reference.npz'
+FIXTURE_SYMBOLS = 10
+
+# pandas_ta version pinned in requirements.txt; the fixture should come from this release
+PINNED_PANDAS_TA = '0.3.14b0'
+
+
+# Function to generate random-walk candles with ragged start rows
+def random_universe(rows=ROWS, symbols=SYMBOLS, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, (rows, symbols)), axis=0))
+    spread = np.abs(rng.normal(0, 0.002, (rows, symbols))) * close
+    high = close + spread
+    low = close - spread
+    starts = rng.integers(0, MAX_START, symbols)
+    starts[0] = 0
+    for column, start in enumerate(starts):
+        high[:start, column] = low[:start, column] = close[:start, column] = np.nan
+    return high, low, close, starts
+
+
+# Function to run calculate_indicators once per symbol, as the bots do (needs pandas_ta)
+def loop_indicators(high, low, close, starts):
+    frames = []
+    for column, start in enumerate(starts):
+        df = pd.DataFrame({
+            'high': high[start:, column],
+            'low': low[start:, column],
+            'close': close[start:, column]
+        })
+        frames.append(calculate_indicators(df, **DEFAULT_INDICATORS))
+    return frames
+
+
+# Function to stack the per-symbol pandas_ta columns back into (time x symbols) matrices
+def reference_matrices(frames, starts, rows):
+    reference = {}
+    for name in ('DEMA', 'MACD', 'MACD_signal', 'Supertrend'):
+        matrix = np.full((rows, len(frames)), np.nan)
+        for column, (df, start) in enumerate(zip(frames, starts)):
+            matrix[start:, column] = df[name].values
+        reference[name] = matrix
+    return reference
+
+
+# Function to write FIXTURE_FILE from the installed pandas_ta
+def generate_fixture(path=FIXTURE_FILE):
+    import pandas_ta as ta
+    if ta.version != PINNED_PANDAS_TA:
+        print(f"Warning: generating from pandas_ta {ta.version}, requirements.txt pins {PINNED_PANDAS_TA}")
+    high, low, close, starts = random_universe(symbols=FIXTURE_SYMBOLS, seed=1)
+    reference = reference_matrices(loop_indicators(high, low, close, starts), starts, len(close))
+    np.savez_compressed(path, high=high, low=low, close=close, starts=starts,
+                        pandas_ta_version=np.array(ta.version), **reference)
+    print(f"Wrote {path} from pandas_ta {ta.version}")
+
+
+# Function to compare the batched output with pandas_ta column by column; returns the worst relative error
+def compare(reference, batched, starts):
+    worst = {}
+    for column, start in enumerate(starts):
+        for name, matrix in batched.items():
+            expected = reference[name][start:, column]
+            actual = matrix[start:, column]
+            if name == 'Supertrend':
+                # pandas_ta leaves 0 in the first row; compare from the end of the ATR warm-up
+                expected = expected[DEFAULT_INDICATORS['supertrend_length']:]
+                actual = actual[DEFAULT_INDICATORS['supertrend_length']:]
+            if (np.isnan(expected) != np.isnan(actual)).any():
+                worst[name] = np.inf
+                continue
+            mask = ~np.isnan(expected)
+            if mask.any():
+                error = np.max(np.abs(expected[mask] - actual[mask]) / np.maximum(np.abs(expected[mask]), 1e-9))
+                worst[name] = max(worst.get(name, 0.0), error)
+    return worst
+
+
+# Function to print the worst errors; returns False if any indicator is outside TOLERANCE
+def report(worst):
+    ok = True
+    for name, error in worst.items():
+        status = "ok" if error <= TOLERANCE else "MISMATCH"
+        ok = ok and error <= TOLERANCE
+        print(f"{name:12s} max relative error {error:.2e} {status}")
+    return ok
+
+
+# Exits non-zero on a mismatch with the fixture or pandas_ta, or when the speedup misses TARGET_SPEEDUP.
+# The fixture check runs without pandas_ta; the timing against the calculate_indicators loop needs it.
+def main():
+    if '--generate' in sys.argv:
+        generate_fixture()
+        return 0
+
+    fixture = np.load(FIXTURE_FILE)
+    version = str(fixture['pandas_ta_version'])
+    print(f"Reference fixture {FIXTURE_FILE} (pandas_ta {version})")
+    if version != PINNED_PANDAS_TA:
+        print(f"Warning: requirements.txt pins pandas_ta {PINNED_PANDAS_TA}; regenerate the fixture with it")
+    batched = batch_indicators(fixture['high'], fixture['low'], fixture['close'], **DEFAULT_INDICATORS)
+    ok = report(compare(fixture, batched, fixture['starts']))
+
+    try:
+        import pandas_ta as ta
+    except ImportError:
+        print("pandas_ta is not installed; skipping the comparison with the calculate_indicators loop")
+        return 0 if ok else 1
+
+    high, low, close, starts = random_universe()
+    print(f"{ROWS} rows x {SYMBOLS} symbols, installed pandas_ta {ta.version}")
+
+    started = time.perf_counter()
+    frames = loop_indicators(high, low, close, starts)
+    loop_seconds = time.perf_counter() - started
+    print(f"calculate_indicators loop: {loop_seconds:.3f}s")
+
+    started = time.perf_counter()
+    batched = batch_indicators(high, low, close, **DEFAULT_INDICATORS)
+    batch_seconds = time.perf_counter() - started
+    print(f"batch_indicators:          {batch_seconds:.3f}s")
+
+    ok = report(compare(reference_matrices(frames, starts, ROWS), batched, starts)) and ok
+
+    speedup = loop_seconds / batch_seconds
+    print(f"Speedup: {speedup:.1f}x (target {TARGET_SPEEDUP}x)")
+    if speedup < TARGET_SPEEDUP:
+        print("Speedup is below the target")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
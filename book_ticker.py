@@ -0,0 +1,121 @@
+import time
+import decimal
+import threading
+
+# Seconds between depth polls for each symbol
+POLL_INTERVAL = 2
+
+# Quotes older than this many seconds are not used for pricing
+MAX_QUOTE_AGE = 10
+
+
+# Function to count the decimals in a price so limit prices keep the exchange precision.
+# Decimal handles scientific notation ('1.2e-05' has 6 decimals) and trailing zeros.
+def price_decimals(price):
+    try:
+        exponent = decimal.Decimal(str(price)).normalize().as_tuple().exponent
+    except decimal.InvalidOperation:
+        return 0
+    return max(-exponent, 0) if isinstance(exponent, int) else 0
+
+
+class BookTicker:
+    # Per-symbol best bid/ask cache kept fresh by a background depth poller
+
+    def __init__(self, make_request, symbols, exchange='coinswitchx', interval=POLL_INTERVAL, max_age=MAX_QUOTE_AGE):
+        self.make_request = make_request
+        self.symbols = list(symbols)
+        self.exchange = exchange
+        self.interval = interval
+        self.max_age = max_age
+        self._quotes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='book-ticker', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def add_symbol(self, symbol):
+        with self._lock:
+            if symbol not in self.symbols:
+                self.symbols.append(symbol)
+
+    def remove_symbol(self, symbol):
+        with self._lock:
+            if symbol in self.symbols:
+                self.symbols.remove(symbol)
+            self._quotes.pop(symbol, None)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.time()
+            with self._lock:
+                symbols = list(self.symbols)
+            for symbol in symbols:
+                # One bad response must not end the poller, or orders silently fall back to the candle close
+                try:
+                    self.refresh(symbol)
+                except Exception as e:
+                    print(f"Failed to refresh the order book for {symbol}: {e}")
+            self._stop.wait(max(0, self.interval - (time.time() - started)))
+
+    # Fetch the order book for a symbol and keep only the top level
+    def refresh(self, symbol):
+        endpoint = "/trade/api/v2/depth"
+        params = {
+            "exchange": self.exchange,
+            "symbol": symbol.upper()
+        }
+        data = self.make_request("GET", endpoint, params=params)
+        if not data or 'data' not in data:
+            return None
+
+        book = data['data']
+        if not isinstance(book, dict):
+            return None
+        bids = book.get('bids') or []
+        asks = book.get('asks') or []
+        if not bids or not asks:
+            return None
+
+        quote = {
+            'bid': float(bids[0][0]),
+            'ask': float(asks[0][0]),
+            'decimals': max(price_decimals(bids[0][0]), price_decimals(asks[0][0])),
+            'time': time.time()
+        }
+        with self._lock:
+            if symbol in self.symbols:
+                self._quotes[symbol] = quote
+        return quote
+
+    # Latest quote for a symbol, or None if it is missing or stale
+    def get(self, symbol):
+        with self._lock:
+            quote = self._quotes.get(symbol)
+        if quote is None or time.time() - quote['time'] > self.max_age:
+            return None
+        return quote
+
+    # Limit price offset from the touch: BUY at bid + offset, SELL at ask - offset (in basis points),
+    # never crossing the opposite side. Falls back to the given price when there is no fresh quote.
+    def limit_price(self, symbol, side, offset_bps=0, fallback=None):
+        quote = self.get(symbol)
+        if quote is None:
+            return fallback
+
+        if side.upper() == 'BUY':
+            price = min(quote['bid'] * (1 + offset_bps / 10000), quote['ask'])
+        else:
+            price = max(quote['ask'] * (1 - offset_bps / 10000), quote['bid'])
+        price = round(price, quote['decimals'])
+        if quote['decimals'] == 0:
+            price = int(price)
+        return price
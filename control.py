@@ -0,0 +1,181 @@
+import json
+import hashlib
+import threading
+from flask import Flask, request, jsonify
+
+# The control API only listens locally
+CONTROL_HOST = '127.0.0.1'
+
+
+class BotConfig:
+    # Live trading configuration shared between the bot loop and the control API.
+    # instruments maps symbol -> per-symbol settings, params holds strategy parameters.
+
+    def __init__(self, instruments, params, resolve=None, in_use=None, seed=None):
+        self._instruments = dict((symbol, dict(settings)) for symbol, settings in instruments.items())
+        self._params = dict(params)
+        # Hash of the configuration in code (plus any extra seed data, e.g. a stock list resolved later),
+        # so a snapshot taken before a deploy that changed it is not restored over the new values
+        self.seed_hash = hashlib.sha256(json.dumps(
+            {'instruments': self._instruments, 'params': self._params, 'seed': seed},
+            sort_keys=True, default=str
+        ).encode('utf-8')).hexdigest()
+        self.resolve = resolve  # resolve(symbol, settings) -> settings, raises ValueError if invalid
+        self.in_use = in_use  # in_use(symbol) -> True while the bot holds a position in it
+        self._on_add = []
+        self._on_remove = []
+        self._lock = threading.Lock()
+
+    def on_add(self, callback):
+        self._on_add.append(callback)
+
+    def on_remove(self, callback):
+        self._on_remove.append(callback)
+
+    def symbols(self):
+        with self._lock:
+            return list(self._instruments)
+
+    def instrument(self, symbol):
+        with self._lock:
+            settings = self._instruments.get(symbol)
+            return None if settings is None else dict(settings)
+
+    def param(self, name):
+        with self._lock:
+            return self._params[name]
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'instruments': dict((symbol, dict(settings)) for symbol, settings in self._instruments.items()),
+                'params': dict(self._params),
+                'seed_hash': self.seed_hash
+            }
+
+    # Add an instrument, or update the settings of one that is already traded
+    def add_instrument(self, symbol, settings=None):
+        with self._lock:
+            existing = self._instruments.get(symbol)
+            merged = dict(existing or {})
+        merged.update(settings or {})
+        if self.resolve is not None:
+            merged = self.resolve(symbol, merged)
+
+        with self._lock:
+            added = symbol not in self._instruments
+            self._instruments[symbol] = merged
+        if added:
+            for callback in self._on_add:
+                callback(symbol)
+        return added
+
+    # Stop trading an instrument; raises ValueError while it has an open position,
+    # since removing it would leave nothing to manage the exit
+    def remove_instrument(self, symbol):
+        if self.in_use is not None and self.in_use(symbol):
+            raise ValueError(f"{symbol} has an open position; close it before removing the instrument")
+        with self._lock:
+            removed = self._instruments.pop(symbol, None) is not None
+        if removed:
+            for callback in self._on_remove:
+                callback(symbol)
+        return removed
+
+    # Change strategy parameters; values are converted to the type of the current value
+    def update_params(self, updates):
+        with self._lock:
+            unknown = [name for name in updates if name not in self._params]
+            if unknown:
+                raise ValueError(f"Unknown parameters: {', '.join(unknown)}")
+            converted = {}
+            for name, value in updates.items():
+                try:
+                    converted[name] = type(self._params[name])(value)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid value for {name}: {value}")
+            self._params.update(converted)
+            return dict(self._params)
+
+    # Re-apply instruments and parameters saved by to_dict(), e.g. from a snapshot.
+    # Skipped (returns False) when the configuration in code has changed since it was saved.
+    def restore(self, state):
+        if state.get('seed_hash') != self.seed_hash:
+            print("Configuration in code changed since the snapshot; keeping it instead of the saved one")
+            return False
+        saved = state.get('instruments', {})
+        for symbol in self.symbols():
+            if symbol not in saved:
+                try:
+                    self.remove_instrument(symbol)
+                except ValueError as e:
+                    print(f"Keeping {symbol}: {e}")
+        for symbol, settings in saved.items():
+            try:
+                self.add_instrument(symbol, settings)
+            except ValueError as e:
+                print(f"Could not restore {symbol}: {e}")
+        with self._lock:
+            known = dict((name, value) for name, value in state.get('params', {}).items() if name in self._params)
+        self.update_params(known)
+        return True
+
+
+# Function to build the Flask app exposing a BotConfig
+def create_control_app(config):
+    app = Flask(__name__)
+
+    @app.route('/config', methods=['GET'])
+    def get_config():
+        return jsonify(config.to_dict()), 200
+
+    # Body: {"symbol": "ETH/INR", ...settings}; warms the new instrument in the background
+    @app.route('/instruments', methods=['POST'])
+    def add_instrument():
+        body = request.get_json(silent=True) or {}
+        symbol = body.pop('symbol', None)
+        if not symbol:
+            return jsonify({"error": "Symbol is missing"}), 400
+
+        try:
+            added = config.add_instrument(symbol, body)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        message = f"{symbol} added" if added else f"{symbol} updated"
+        return jsonify({"message": message, "instrument": config.instrument(symbol)}), 200
+
+    @app.route('/instruments/<path:symbol>', methods=['DELETE'])
+    def remove_instrument(symbol):
+        try:
+            removed = config.remove_instrument(symbol)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 409
+        if not removed:
+            return jsonify({"error": f"{symbol} is not being traded"}), 404
+        return jsonify({"message": f"{symbol} removed"}), 200
+
+    # Body: {"target_multiplier": 1.05, ...}
+    @app.route('/params', methods=['POST', 'PATCH'])
+    def update_params():
+        body = request.get_json(silent=True) or {}
+        try:
+            params = config.update_params(body)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({"message": "Parameters updated", "params": params}), 200
+
+    return app
+
+
+# Function to serve the control API from a background thread of a running bot
+def start_control_server(config, port, host=CONTROL_HOST):
+    app = create_control_app(config)
+    thread = threading.Thread(
+        target=app.run,
+        kwargs={'host': host, 'port': port, 'use_reloader': False},
+        name='control-server',
+        daemon=True
+    )
+    thread.start()
+    print(f"Control API listening on http://{host}:{port}")
+    return thread
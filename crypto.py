@@ -3,10 +3,17 @@ import hmac
 import hashlib
 import requests
 import pandas as pd
-import pandas_ta as ta
 from datetime import datetime, timedelta
 from urllib.parse import urlencode, urlparse, unquote_plus
 from cryptography.hazmat.primitives.asymmetric import ed25519
+from book_ticker import BookTicker
+from order_store import OrderStore
+from market_data import BarCache
+from indicators import calculate_indicators
+from signals import entry_signal, exit_signal
+from control import BotConfig, start_control_server
+from snapshot import save_snapshot, load_snapshot
+from market_calendar import get_calendar, CLOSED, OPEN
 
 # Replace with your API Key and Secret Key provided by CoinSwitch Kuber
 api_key = ""
@@ -28,6 +35,37 @@ positions = {}
 # Base URL for API endpoints
 BASE_URL = "https://coinswitch.co"
 
+# Limit orders are priced this many basis points inside the touch (BUY above the bid, SELL below the ask)
+PRICE_OFFSET_BPS = 2
+
+# Crypto trades around the clock; the calendar keeps session handling the same as script.py
+exchange_calendar = get_calendar('CRYPTO')
+
+# Port of the local control API used to change symbols and parameters while the bot runs
+CONTROL_PORT = 5001
+
+# Function to validate instruments added through the control API
+def resolve_instrument(symbol, settings):
+    if 'quantity' not in settings:
+        raise ValueError("quantity is required")
+    try:
+        settings['quantity'] = float(settings['quantity'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid quantity: {settings['quantity']}")
+    return settings
+
+# Live configuration seeded from the trading parameters above (symbols without a quantity are skipped)
+config = BotConfig(
+    dict((symbol, {'quantity': quantityMap[symbol]}) for symbol in symbols if symbol in quantityMap),
+    {
+        'target_multiplier': 1.10,
+        'stop_multiplier': 0.95,
+        'price_offset_bps': float(PRICE_OFFSET_BPS)
+    },
+    resolve=resolve_instrument,
+    in_use=lambda symbol: symbol in positions
+)
+
 # Function to create the signature required for authentication
 def get_signature(method, endpoint, params, epoch_time):
     if method == "GET" and params:
@@ -83,13 +121,19 @@ def make_request(method, endpoint, params=None, data=None):
         print(f"Request failed: {e}")
         return None
 
+# Top-of-book cache used to price limit orders without an extra round trip
+book_ticker = BookTicker(make_request, config.symbols())
+
+# Local order book, synced with one delta request per cycle
+order_store = OrderStore(make_request)
+
 # Function to get historical data for a symbol
 def get_historical_data(symbol, exchange='coinswitchx', interval=1, days=10):
     endpoint = "/trade/api/v2/candles"
     method = "GET"
     
     end_time = int(time.time() * 1000)  # Current time in milliseconds
-    start_time = end_time - (days * 24 * 60 * 60 * 1000)  # Start time in milliseconds
+    start_time = end_time - int(days * 24 * 60 * 60 * 1000)  # Start time in milliseconds
     
     params = {
         "exchange": exchange,
@@ -124,35 +168,6 @@ def get_historical_data(symbol, exchange='coinswitchx', interval=1, days=10):
         return pd.DataFrame()
 
 
-def get_open_orders(count=100, from_time=None, to_time=None, side=None, symbols=None, exchanges=None, type=None):
-    endpoint = "/trade/api/v2/orders"
-    method = "GET"
-    params = {
-        "count": count,
-        "open": True  # We set open=True to get only open orders
-    }
-    if from_time:
-        params["from_time"] = str(from_time)
-    if to_time:
-        params["to_time"] = str(to_time)
-    if side:
-        params["side"] = side.lower()
-    if symbols:
-        params["symbols"] = ",".join(symbols)
-    if exchanges:
-        params["exchanges"] = ",".join(exchanges)
-    if type:
-        params["type"] = type.lower()
-    
-    data = make_request(method, endpoint, params=params)
-    if data and 'data' in data:
-        orders = data['data']
-        return orders
-    else:
-        print("Failed to fetch open orders.")
-        return []
-
-
 def cancel_order(order_id):
     endpoint = "/trade/api/v2/order"
     method = "DELETE"
@@ -179,67 +194,111 @@ def place_order(symbol, side, quantity, price=None):
         "quantity": quantity,
         "exchange": "coinswitchx"
     }
+    # Price off the live book; the candle close passed in is only a fallback
+    price = book_ticker.limit_price(symbol, side, config.param('price_offset_bps'), fallback=price)
     if price:
         data["price"] = price
 
     response = make_request(method, endpoint, data=data)
     if response and 'data' in response:
-        print(f"Order placed successfully. Order ID: {response['data']}")
-        return response['data']
+        order = response['data']
+        order_id = order.get('order_id') if isinstance(order, dict) else order
+        print(f"Order placed successfully. Order ID: {order_id}")
+        return order_id
     else:
         print(f"Failed to place order for {symbol}")
         return None
 
-# Function to calculate technical indicators
-def calculate_indicators(df):
-    # DEMA (Double Exponential Moving Average)
-    df['DEMA_200'] = ta.dema(df['close'], length=200)
-
-    # MACD
-    macd = ta.macd(df['close'], fast=12, slow=26, signal=9)
-    df['MACD'] = macd['MACD_12_26_9']
-    df['MACD_signal'] = macd['MACDs_12_26_9']
-
-    # Supertrend
-    supertrend = ta.supertrend(df['high'], df['low'], df['close'], length=7, multiplier=3.0)
-    df['Supertrend'] = supertrend['SUPERT_7_3.0']
+# Candle buffers with indicators; only new candles are downloaded after warm-up
+bars = BarCache(
+    lambda symbol, days: get_historical_data(symbol, exchange='coinswitchx', interval=5, days=days),
+    days=2,
+    compute=calculate_indicators,
+    min_rows=200
+)
+
+config.on_add(bars.warm_async)
+config.on_add(book_ticker.add_symbol)
+config.on_remove(bars.drop)
+config.on_remove(book_ticker.remove_symbol)
+
+# Live state snapshot used for fast warm restarts
+SNAPSHOT_FILE = 'crypto.snapshot'
+SNAPSHOT_INTERVAL = 30  # Seconds between snapshots
+
+# Function to write candle buffers with indicators, positions, orders and config to the snapshot
+def save_state():
+    try:
+        save_snapshot(SNAPSHOT_FILE, bars.export(), {
+            'positions': positions,
+            'orders': order_store.to_dict(),
+            'config': config.to_dict()
+        })
+    except Exception as e:
+        print(f"Failed to write snapshot: {e}")
 
-    return df
+# Function to restore the snapshot; only candles after it are downloaded on the next update
+def restore_state():
+    snapshot = load_snapshot(SNAPSHOT_FILE)
+    if snapshot is None:
+        return False
+    state = snapshot['state']
+    restored = bars.restore(snapshot['frames'])
+    positions.update(state.get('positions', {}))
+    order_store.load_dict(state.get('orders', {}))
+    config.restore(state.get('config', {}))
+    # Buffers of symbols that are no longer configured would never be updated or freed
+    stale = bars.retain(config.symbols())
+    print(f"Restored {len(restored) - len(stale)} candle buffers from {SNAPSHOT_FILE} ({time.time() - snapshot['created']:.0f}s old)")
+    return True
 
 # Main trading loop
 def trading_bot():
+    restore_state()
+    book_ticker.start()
+    start_control_server(config, CONTROL_PORT)
+    for symbol in config.symbols():
+        bars.warm_async(symbol)
+    last_snapshot = time.time()
+
     while True:
+        phase = exchange_calendar.phase()
+        if phase == CLOSED:
+            time.sleep(exchange_calendar.seconds_until_warmup())
+            continue
+
         current_time = datetime.now()
         # Run every 10 seconds
         if current_time.second % 10 == 0:
-            for symbol in symbols:
+            order_store.sync()
+            for symbol in config.symbols():
+                settings = config.instrument(symbol)
+                if settings is None:
+                    continue
+                if not bars.is_ready(symbol):
+                    print(f"Waiting for {symbol} to warm up")
+                    bars.warm_async(symbol)
+                    continue
+
                 print(f"Processing symbol: {symbol}")
-                df = get_historical_data(symbol, exchange='coinswitchx', interval=5, days=2)
-                if df.empty or len(df) < 200:
+                df = bars.update(symbol)
+                if df is None or len(df) < 200:
                     print(f"Not enough data for {symbol}")
                     continue
 
-                df = calculate_indicators(df)
-
                 # Get the latest data point
                 latest = df.iloc[-1]
-                previous = df.iloc[-2]
                 print(f"{symbol} at {latest['close']} at {current_time}")
 
                 # Entry Conditions
                 if symbol not in positions:
-                    entry_condition = (
-                        latest['close'] > latest['DEMA_200'] and
-                        previous['MACD'] < previous['MACD_signal'] and
-                        latest['MACD'] > latest['MACD_signal']
-                    )
-                    open_orders=get_open_orders();
-                    print(open_orders);
-                    # for order in open_orders['orders']:
+                    open_orders = order_store.open_orders(symbol)
+                    print(open_orders)
+                    # for order in open_orders:
                     #     cancel_order(order['order_id'])
-                    if entry_condition:
+                    if entry_signal(df) and phase == OPEN:
                         # Place Buy Order
-                        quantity = quantityMap[symbol]  # Adjust quantity as per your requirements
+                        quantity = settings['quantity']  # Adjust quantity through the control API
                         order_id = place_order(symbol, 'BUY', quantity, price=latest['close'])
                         if order_id:
                             positions[symbol] = {
@@ -252,18 +311,13 @@ def trading_bot():
 
                 # Exit Conditions
                 else:
-                    position = positions[symbol]
-                    entry_price = position['entry_price']
-                    target_price = entry_price * 1.10  # Target Profit of 10%
-                    stop_loss_price = entry_price * 0.95  # Stop Loss of 5%
-
-                    exit_condition = (
-                        (previous['close'] > previous['Supertrend'] and latest['close'] < latest['Supertrend']) or
-                        latest['close'] <= stop_loss_price or
-                        latest['close'] >= target_price
-                    )
-
-                    if exit_condition:
+                    position = order_store.reconcile_position(positions[symbol])
+                    if position is None:
+                        print(f"Entry order for {symbol} closed unfilled, dropping position")
+                        del positions[symbol]
+                        continue
+                    if exit_signal(df, position['entry_price'], config.param('target_multiplier'),
+                                   config.param('stop_multiplier')):
                         # Place Sell Order
                         quantity = position['quantity']
                         order_id = place_order(symbol, 'SELL', quantity, price=latest['close'])
@@ -271,13 +325,23 @@ def trading_bot():
                             print(f"Exited position for {symbol} at {latest['close']}")
                             del positions[symbol]
 
-            # Sleep for 10 seconds before checking again
+            # Snapshot the live state for a fast warm restart
+            if time.time() - last_snapshot >= SNAPSHOT_INTERVAL:
+                save_state()
+                last_snapshot = time.time()
+
+            # Sleep until the next 10-second mark
+            time.sleep(10 - datetime.now().second % 10)
+        else:
+            # Sleep until the start of the next second before checking again
+            time.sleep(1 - datetime.now().microsecond / 1000000)
 
 # Run the trading bot
 if __name__ == "__main__":
     try:
         trading_bot()
     except KeyboardInterrupt:
+        save_state()
         print("Trading bot stopped manually.")
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -3,10 +3,17 @@ import json
 import os
 import requests
 import pandas as pd
-import pandas_ta as ta
 from datetime import datetime
 from urllib.parse import urlencode, unquote_plus
 from cryptography.hazmat.primitives.asymmetric import ed25519
+from book_ticker import BookTicker
+from order_store import OrderStore
+from market_data import BarCache
+from indicators import calculate_indicators
+from signals import entry_signal, exit_signal
+from control import BotConfig, start_control_server
+from snapshot import save_snapshot, load_snapshot
+from market_calendar import get_calendar, CLOSED, OPEN
 
 # Replace with your API Key and Secret Key provided by CoinSwitch Kuber
 api_key = ""
@@ -25,6 +32,37 @@ POSITIONS_FILE = 'crypto_position.json'
 # Base URL for API endpoints
 BASE_URL = "https://coinswitch.co"
 
+# Limit orders are priced this many basis points inside the touch (BUY above the bid, SELL below the ask)
+PRICE_OFFSET_BPS = 2
+
+# Crypto trades around the clock; the calendar keeps session handling the same as script.py
+exchange_calendar = get_calendar('CRYPTO')
+
+# Port of the local control API used to change symbols and parameters while the bot runs
+CONTROL_PORT = 5002
+
+# Function to validate instruments added through the control API
+def resolve_instrument(symbol, settings):
+    if 'quantity' not in settings:
+        raise ValueError("quantity is required")
+    try:
+        settings['quantity'] = float(settings['quantity'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid quantity: {settings['quantity']}")
+    return settings
+
+# Live configuration seeded from the trading parameters above (symbols without a quantity are skipped)
+config = BotConfig(
+    dict((symbol, {'quantity': quantityMap[symbol]}) for symbol in symbols if symbol in quantityMap),
+    {
+        'target_multiplier': 1.02,
+        'stop_multiplier': 0.98,
+        'price_offset_bps': float(PRICE_OFFSET_BPS)
+    },
+    resolve=resolve_instrument,
+    in_use=lambda symbol: symbol in load_positions()
+)
+
 # Load positions from JSON file
 def load_positions():
     if os.path.exists(POSITIONS_FILE):
@@ -105,13 +143,19 @@ def make_request(method, endpoint, params=None, data=None):
         print(f"Request failed: {e}")
         return None
 
+# Top-of-book cache used to price limit orders without an extra round trip
+book_ticker = BookTicker(make_request, config.symbols())
+
+# Local order book, synced with one delta request per cycle
+order_store = OrderStore(make_request)
+
 # Function to get historical data for a symbol
 def get_historical_data(symbol, exchange='coinswitchx', interval=1, days=1):
     endpoint = "/trade/api/v2/candles"
     method = "GET"
 
     end_time = int(time.time() * 1000)  # Current time in milliseconds
-    start_time = end_time - (days * 24 * 60 * 60 * 1000)  # Start time in milliseconds
+    start_time = end_time - int(days * 24 * 60 * 60 * 1000)  # Start time in milliseconds
 
     params = {
         "exchange": exchange,
@@ -155,6 +199,8 @@ def place_order(symbol, side, quantity, price=None):
         "quantity": str(quantity),
         "exchange": "coinswitchx"
     }
+    # Price off the live book; the candle close passed in is only a fallback
+    price = book_ticker.limit_price(symbol, side, config.param('price_offset_bps'), fallback=price)
     if price:
         data["price"] = str(price)
 
@@ -166,53 +212,90 @@ def place_order(symbol, side, quantity, price=None):
         print(f"Failed to place order for {symbol}")
         return None
 
-# Function to calculate technical indicators
-def calculate_indicators(df):
-    # DEMA (Double Exponential Moving Average)
-    df['DEMA_200'] = ta.dema(df['close'], length=200)
-
-    # MACD
-    macd = ta.macd(df['close'], fast=12, slow=26, signal=9)
-    df['MACD'] = macd['MACD_12_26_9']
-    df['MACD_signal'] = macd['MACDs_12_26_9']
-
-    # Supertrend
-    supertrend = ta.supertrend(df['high'], df['low'], df['close'], length=7, multiplier=3.0)
-    df['Supertrend'] = supertrend['SUPERT_7_3.0']
-
-    return df
+# Candle buffers with indicators; only new candles are downloaded after warm-up
+bars = BarCache(
+    lambda symbol, days: get_historical_data(symbol, exchange='coinswitchx', interval=5, days=days),
+    days=4,
+    compute=calculate_indicators,
+    min_rows=200
+)
+
+config.on_add(bars.warm_async)
+config.on_add(book_ticker.add_symbol)
+config.on_remove(bars.drop)
+config.on_remove(book_ticker.remove_symbol)
+
+# Live state snapshot used for fast warm restarts
+SNAPSHOT_FILE = 'crypto2.snapshot'
+SNAPSHOT_INTERVAL = 30  # Seconds between snapshots
+
+# Function to write candle buffers with indicators, orders and config to the snapshot
+def save_state():
+    try:
+        save_snapshot(SNAPSHOT_FILE, bars.export(), {
+            'orders': order_store.to_dict(),
+            'config': config.to_dict()
+        })
+    except Exception as e:
+        print(f"Failed to write snapshot: {e}")
+
+# Function to restore the snapshot; only candles after it are downloaded on the next update
+def restore_state():
+    snapshot = load_snapshot(SNAPSHOT_FILE)
+    if snapshot is None:
+        return False
+    state = snapshot['state']
+    restored = bars.restore(snapshot['frames'])
+    order_store.load_dict(state.get('orders', {}))
+    config.restore(state.get('config', {}))
+    # Buffers of symbols that are no longer configured would never be updated or freed
+    stale = bars.retain(config.symbols())
+    print(f"Restored {len(restored) - len(stale)} candle buffers from {SNAPSHOT_FILE} ({time.time() - snapshot['created']:.0f}s old)")
+    return True
 
 # Main trading loop
 def trading_bot():
     positions = load_positions()  # Load the current positions at startup
+    restore_state()
+    book_ticker.start()
+    start_control_server(config, CONTROL_PORT)
+    for symbol in config.symbols():
+        bars.warm_async(symbol)
+    last_snapshot = time.time()
 
     while True:
+        phase = exchange_calendar.phase()
+        if phase == CLOSED:
+            time.sleep(exchange_calendar.seconds_until_warmup())
+            continue
+
         current_time = datetime.now()
         # Run every 1 minute
         if current_time.second == 0:
-            for symbol in symbols:
+            order_store.sync()
+            for symbol in config.symbols():
+                settings = config.instrument(symbol)
+                if settings is None:
+                    continue
+                if not bars.is_ready(symbol):
+                    print(f"Waiting for {symbol} to warm up")
+                    bars.warm_async(symbol)
+                    continue
+
                 print(f"Processing symbol: {symbol}")
-                df = get_historical_data(symbol, exchange='coinswitchx', interval=5, days=4)
-                if df.empty or len(df) < 200:
+                df = bars.update(symbol)
+                if df is None or len(df) < 200:
                     print(f"Not enough data for {symbol}")
                     continue
 
-                df = calculate_indicators(df)
-
                 # Get the latest data point
                 latest = df.iloc[-1]
-                previous = df.iloc[-2]
 
                 # Entry Conditions
                 if symbol not in positions:
-                    entry_condition = (
-                        latest['close'] > latest['DEMA_200'] and
-                        previous['MACD'] < previous['MACD_signal'] and
-                        latest['MACD'] > latest['MACD_signal']
-                    )
-                    if entry_condition:
+                    if entry_signal(df) and phase == OPEN:
                         # Place Buy Order
-                        quantity =  quantityMap[symbol]  # Adjust quantity as per your requirements
+                        quantity =  settings['quantity']  # Adjust quantity through the control API
                         order_id = place_order(symbol, 'BUY', quantity, price=latest['close'])
                         if order_id:
                             position_data = {
@@ -221,23 +304,23 @@ def trading_bot():
                                 'entry_time': current_time.isoformat(),
                                 'order_id': order_id
                             }
+                            positions[symbol] = position_data
                             update_position(symbol, position_data)  # Save position to JSON file
                             print(f"Entered position for {symbol} at {latest['close']}")
 
                 # Exit Conditions
                 else:
-                    position = positions[symbol]
-                    entry_price = position['entry_price']
-                    target_price = entry_price * 1.02  # Target Profit of 2%
-                    stop_loss_price = entry_price * 0.98  # Stop Loss of 2%
-
-                    exit_condition = (
-                        (previous['close'] > previous['Supertrend'] and latest['close'] < latest['Supertrend']) or
-                        latest['close'] <= stop_loss_price or
-                        latest['close'] >= target_price
-                    )
-
-                    if exit_condition:
+                    before = dict(positions[symbol])
+                    position = order_store.reconcile_position(positions[symbol])
+                    if position is None:
+                        print(f"Entry order for {symbol} closed unfilled, dropping position")
+                        del positions[symbol]
+                        remove_position(symbol)
+                        continue
+                    if position != before:
+                        update_position(symbol, position)  # Save the filled quantity and price
+                    if exit_signal(df, position['entry_price'], config.param('target_multiplier'),
+                                   config.param('stop_multiplier')):
                         # Place Sell Order
                         quantity = position['quantity']
                         order_id = place_order(symbol, 'SELL', quantity, price=latest['close'])
@@ -246,13 +329,23 @@ def trading_bot():
                             del positions[symbol]
                             save_positions(positions)
 
-            # Sleep for 10 seconds before checking again
+            # Snapshot the live state for a fast warm restart
+            if time.time() - last_snapshot >= SNAPSHOT_INTERVAL:
+                save_state()
+                last_snapshot = time.time()
+
+            # Sleep until the next minute
+            time.sleep(60 - datetime.now().second)
+        else:
+            # Sleep until the start of the next second before checking again
+            time.sleep(1 - datetime.now().microsecond / 1000000)
 
 # Run the trading bot
 if __name__ == "__main__":
     try:
         trading_bot()
     except KeyboardInterrupt:
+        save_state()
         print("Trading bot stopped manually.")
     except Exception as e:
         print(f"An error occurred: {e}")
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+
+# Indicator settings used by the DEMA/MACD/Supertrend strategy in every bot
+DEFAULT_INDICATORS = {
+    'dema_length': 200,
+    'macd_fast': 12,
+    'macd_slow': 26,
+    'macd_signal': 9,
+    'supertrend_length': 7,
+    'supertrend_multiplier': 3.0
+}
+
+
+# Function to turn indicator settings into a hashable key, so identical settings share one computation
+def indicator_key(settings):
+    merged = dict(DEFAULT_INDICATORS)
+    merged.update(settings or {})
+    return tuple(sorted(merged.items()))
+
+
+# Function to calculate technical indicators with configurable settings.
+# Columns are named DEMA, MACD, MACD_signal and Supertrend whatever the settings.
+def calculate_indicators(df, dema_length=200, macd_fast=12, macd_slow=26, macd_signal=9,
+                         supertrend_length=7, supertrend_multiplier=3.0):
+    # Imported here so the batched kernels below can be used without pandas_ta installed
+    import pandas_ta as ta
+
+    # DEMA (Double Exponential Moving Average)
+    dema = ta.dema(df['close'], length=dema_length)
+    df['DEMA'] = np.nan if dema is None else dema
+
+    # MACD
+    macd = ta.macd(df['close'], fast=macd_fast, slow=macd_slow, signal=macd_signal)
+    suffix = f"_{macd_fast}_{macd_slow}_{macd_signal}"
+    df['MACD'] = np.nan if macd is None else macd[f"MACD{suffix}"]
+    df['MACD_signal'] = np.nan if macd is None else macd[f"MACDs{suffix}"]
+
+    # Supertrend
+    supertrend = ta.supertrend(df['high'], df['low'], df['close'],
+                               length=supertrend_length, multiplier=supertrend_multiplier)
+    column = f"SUPERT_{supertrend_length}_{float(supertrend_multiplier)}"
+    df['Supertrend'] = np.nan if supertrend is None else supertrend[column]
+
+    return df
+
+
+# Batched kernels: every argument is a (time x symbols) NumPy matrix and every column is computed
+# in the same pass. A column may start later than the others (leading NaNs); its values match
+# running the pandas_ta indicator on that symbol's own history. Interior gaps should be filled
+# by the caller (price_matrix forward-fills them).
+
+
+# Function to find the first row of each column that holds a price (len(matrix) if none)
+def first_valid_rows(matrix):
+    valid = ~np.isnan(matrix)
+    return np.where(valid.any(axis=0), valid.argmax(axis=0), len(matrix))
+
+
+# Function to compute an EMA per column seeded like pandas_ta: the first value, at start + length - 1,
+# is close[0:length].mean(), which skips NaNs (so the EMA of an EMA seeds from its first value),
+# then ewm(adjust=False) follows
+def batch_ema(matrix, length, start=None):
+    rows, columns = matrix.shape
+    if start is None:
+        start = first_valid_rows(matrix)
+    alpha = 2.0 / (length + 1)
+    out = np.full(matrix.shape, np.nan)
+
+    seed_row = start + length - 1
+    active = seed_row < rows
+    if not active.any():
+        return out
+
+    # Mean of each column's seed window from cumulative sums, so ragged windows need no loop
+    valid = ~np.isnan(matrix)
+    sums = np.vstack([np.zeros(columns), np.cumsum(np.where(valid, matrix, 0.0), axis=0)])
+    counts = np.vstack([np.zeros(columns), np.cumsum(valid, axis=0)])
+    cols = np.arange(columns)[active]
+    window_sum = sums[seed_row[active] + 1, cols] - sums[start[active], cols]
+    window_count = counts[seed_row[active] + 1, cols] - counts[start[active], cols]
+    seed = np.full(columns, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        seed[active] = window_sum / window_count
+
+    previous = np.full(columns, np.nan)
+    for t in range(int(seed_row[active].min()), rows):
+        x = matrix[t]
+        current = previous * (1 - alpha) + alpha * x
+        current = np.where(np.isnan(x), previous, current)
+        current = np.where(seed_row == t, seed, current)
+        out[t] = current
+        previous = current
+    return out
+
+
+# Function to compute DEMA per column (2 * EMA - EMA of EMA, as pandas_ta.dema)
+def batch_dema(close, length=200, start=None):
+    if start is None:
+        start = first_valid_rows(close)
+    ema1 = batch_ema(close, length, start)
+    ema2 = batch_ema(ema1, length, start)
+    return 2 * ema1 - ema2
+
+
+# Function to compute MACD and its signal line per column (as pandas_ta.macd)
+def batch_macd(close, fast=12, slow=26, signal=9, start=None):
+    if start is None:
+        start = first_valid_rows(close)
+    macd = batch_ema(close, fast, start) - batch_ema(close, slow, start)
+    signal_line = batch_ema(macd, signal, start + slow - 1)
+    return macd, signal_line
+
+
+# Function to compute ATR per column: RMA (ewm with alpha = 1 / length, adjust=True) of the true range
+def batch_atr(high, low, close, length=14, start=None):
+    rows, columns = close.shape
+    if start is None:
+        start = first_valid_rows(close)
+    previous_close = np.vstack([np.full(columns, np.nan), close[:-1]])
+    with np.errstate(invalid='ignore'):
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(previous_close - low)))
+    true_range[np.arange(rows)[:, None] <= start] = np.nan
+
+    alpha = 1.0 / length
+    out = np.full(close.shape, np.nan)
+    numerator = np.zeros(columns)
+    denominator = np.zeros(columns)
+    count = np.zeros(columns)
+    for t in range(rows):
+        x = true_range[t]
+        valid = ~np.isnan(x)
+        numerator = np.where(valid, x + (1 - alpha) * numerator, numerator)
+        denominator = np.where(valid, 1 + (1 - alpha) * denominator, denominator)
+        count += valid
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out[t] = np.where(count >= length, numerator / denominator, np.nan)
+    return out
+
+
+# Function to compute Supertrend per column (the SUPERT line of pandas_ta.supertrend).
+# Rows before the ATR warm-up are NaN.
+def batch_supertrend(high, low, close, length=7, multiplier=3.0, start=None):
+    rows, columns = close.shape
+    if start is None:
+        start = first_valid_rows(close)
+    hl2 = (high + low) / 2
+    band = multiplier * batch_atr(high, low, close, length, start)
+    upper = hl2 + band
+    lower = hl2 - band
+
+    trend = np.full(close.shape, np.nan)
+    direction = np.ones(columns)
+    for t in range(1, rows):
+        active = t > start
+        c = close[t]
+        with np.errstate(invalid='ignore'):
+            breaks_up = c > upper[t - 1]
+            breaks_down = c < lower[t - 1]
+            new_direction = np.where(breaks_up, 1.0, np.where(breaks_down, -1.0, direction))
+            keep = ~breaks_up & ~breaks_down
+            lower[t] = np.where(keep & (new_direction > 0) & (lower[t] < lower[t - 1]), lower[t - 1], lower[t])
+            upper[t] = np.where(keep & (new_direction < 0) & (upper[t] > upper[t - 1]), upper[t - 1], upper[t])
+        direction = np.where(active, new_direction, direction)
+        trend[t] = np.where(active, np.where(direction > 0, lower[t], upper[t]), np.nan)
+    return trend
+
+
+# Function to compute all strategy indicators for a whole universe in one call.
+# Returns matrices keyed like the DataFrame columns of calculate_indicators.
+def batch_indicators(high, low, close, dema_length=200, macd_fast=12, macd_slow=26, macd_signal=9,
+                     supertrend_length=7, supertrend_multiplier=3.0):
+    start = first_valid_rows(close)
+    macd, signal_line = batch_macd(close, macd_fast, macd_slow, macd_signal, start)
+    return {
+        'DEMA': batch_dema(close, dema_length, start),
+        'MACD': macd,
+        'MACD_signal': signal_line,
+        'Supertrend': batch_supertrend(high, low, close, supertrend_length, supertrend_multiplier, start)
+    }
+
+
+# Function to align one column of several symbols' candle frames into a (time x symbols) matrix.
+# Symbols that start later get leading NaNs; gaps after a symbol's first candle are forward-filled.
+def price_matrix(frames, column='close', time_column='timestamp'):
+    symbols = list(frames)
+    series = [frames[symbol].set_index(time_column)[column] for symbol in symbols]
+    matrix = pd.concat(series, axis=1, keys=symbols).sort_index().ffill()
+    return matrix.index, symbols, matrix.values.astype(float)
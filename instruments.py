@@ -0,0 +1,222 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from datetime import date
+
+# Local cache of the Kite instrument master (refreshed once a day)
+INSTRUMENTS_DIR = 'instruments'
+INSTRUMENTS_FILE = os.path.join(INSTRUMENTS_DIR, 'instruments.npy')
+
+# NSE publishes index constituents as CSV files with a 'Symbol' column
+INDEX_CONSTITUENTS_URLS = {
+    'nifty50': 'https://archives.nseindia.com/content/indices/ind_nifty50list.csv',
+    'nifty100': 'https://archives.nseindia.com/content/indices/ind_nifty100list.csv',
+    'nifty200': 'https://archives.nseindia.com/content/indices/ind_nifty200list.csv',
+    'nifty500': 'https://archives.nseindia.com/content/indices/ind_nifty500list.csv',
+}
+
+# Seconds to wait before retrying a failed download
+RETRY_SECONDS = 60
+
+# Columns kept from the instruments dump; strings are stored as fixed width bytes
+STRING_COLUMNS = ['tradingsymbol', 'name', 'exchange', 'segment', 'instrument_type']
+NUMERIC_COLUMNS = [
+    ('instrument_token', 'i8'),
+    ('exchange_token', 'i8'),
+    ('strike', 'f8'),
+    ('tick_size', 'f8'),
+    ('lot_size', 'i4'),
+]
+
+
+# Function to convert the Kite instruments dump into a compact structured array
+def build_instrument_table(instruments):
+    df = pd.DataFrame(instruments)
+    if df.empty:
+        df = pd.DataFrame(columns=[name for name, _ in NUMERIC_COLUMNS] + STRING_COLUMNS + ['expiry'])
+
+    columns = []
+    for column, dtype in NUMERIC_COLUMNS:
+        values = pd.to_numeric(df[column], errors='coerce').fillna(0).values.astype(dtype)
+        columns.append((column, values))
+    for column in STRING_COLUMNS:
+        values = df[column].fillna('').astype(str).str.encode('utf-8').values.astype('S')
+        columns.append((column, values))
+    expiry = pd.to_datetime(df['expiry'], errors='coerce').values.astype('M8[D]')
+    columns.append(('expiry', expiry))
+
+    table = np.zeros(len(df), dtype=[(name, values.dtype) for name, values in columns])
+    for name, values in columns:
+        table[name] = values
+    return table
+
+
+# Function to write the table atomically so a running bot never sees a half written file
+def save_instrument_table(table, path=INSTRUMENTS_FILE):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, table, allow_pickle=False)
+    os.replace(tmp_path, path)
+
+
+# Function to read the constituents of an NSE index (e.g. 'nifty500') as a set of tradingsymbols
+def load_index_constituents(index, directory=INSTRUMENTS_DIR):
+    path = os.path.join(directory, f"{index}.csv")
+    if not os.path.exists(path) or date.fromtimestamp(os.path.getmtime(path)) != date.today():
+        if index not in INDEX_CONSTITUENTS_URLS:
+            print(f"Unknown index {index}")
+            return set()
+        try:
+            df = pd.read_csv(INDEX_CONSTITUENTS_URLS[index])
+            os.makedirs(directory, exist_ok=True)
+            df.to_csv(path, index=False)
+        except Exception as e:
+            print(f"Failed to download constituents for {index}: {e}")
+            if not os.path.exists(path):
+                return set()
+    df = pd.read_csv(path)
+    return set(df['Symbol'].astype(str).str.strip())
+
+
+class InstrumentMaster:
+    # Memory-mapped instrument master with lazily built O(1) lookup indexes
+
+    def __init__(self, kite=None, path=INSTRUMENTS_FILE):
+        self.kite = kite
+        self.path = path
+        self._table = None
+        self._indexes = {}
+        self._checked_on = None
+        self._failed_at = 0
+        self._empty_at = None
+
+    # Download a fresh dump if the cached one is not from today
+    def refresh(self, force=False):
+        today = date.today()
+        if not force and self._checked_on == today:
+            return False
+        if not force and os.path.exists(self.path) and date.fromtimestamp(os.path.getmtime(self.path)) == today:
+            self._checked_on = today
+            return False
+        if not force and time.time() - self._failed_at < RETRY_SECONDS:
+            return False
+        if self.kite is None:
+            print("No Kite client available to download instruments.")
+            self._failed_at = time.time()
+            return False
+
+        try:
+            start = time.time()
+            table = build_instrument_table(self.kite.instruments())
+            save_instrument_table(table, self.path)
+            print(f"Downloaded {len(table)} instruments in {time.time() - start:.1f}s")
+        except Exception as e:
+            print(f"Failed to download instruments: {e}")
+            self._failed_at = time.time()
+            return False
+
+        self._checked_on = today
+        self._table = None
+        self._indexes = {}
+        self._empty_at = None
+        return True
+
+    # Without a dump on disk an empty table is served until the download backoff expires
+    @property
+    def table(self):
+        if self._empty_at is not None and time.time() - self._empty_at >= RETRY_SECONDS:
+            self._table = None
+            self._indexes = {}
+            self._empty_at = None
+        if self._table is None:
+            if not os.path.exists(self.path):
+                self.refresh()
+            if not os.path.exists(self.path):
+                self._table = build_instrument_table([])
+                self._empty_at = time.time()
+                return self._table
+            self._table = np.load(self.path, mmap_mode='r', allow_pickle=False)
+        return self._table
+
+    # False while no instrument master could be loaded, so callers can skip resolving against it
+    @property
+    def available(self):
+        return len(self.table) > 0
+
+    # Build a lookup index the first time it is used
+    def _index(self, name):
+        if name not in self._indexes:
+            table = self.table
+            if name == 'symbol':
+                keys = zip(table['exchange'].tolist(), table['tradingsymbol'].tolist())
+                self._indexes[name] = dict((key, i) for i, key in enumerate(keys))
+            elif name == 'token':
+                self._indexes[name] = dict((token, i) for i, token in enumerate(table['instrument_token'].tolist()))
+            else:
+                values, inverse = np.unique(np.asarray(table[name]), return_inverse=True)
+                order = np.argsort(inverse, kind='stable')
+                bounds = np.searchsorted(inverse[order], np.arange(len(values) + 1))
+                self._indexes[name] = dict(
+                    (value, order[bounds[i]:bounds[i + 1]]) for i, value in enumerate(values.tolist())
+                )
+        return self._indexes[name]
+
+    def _row(self, i):
+        row = self.table[i]
+        record = {}
+        for name in row.dtype.names:
+            value = row[name]
+            if name in STRING_COLUMNS:
+                value = value.decode('utf-8')
+            elif name == 'expiry':
+                value = None if np.isnat(value) else value.astype(object)
+            else:
+                value = value.item()
+            record[name] = value
+        return record
+
+    # Look up an instrument by exchange and tradingsymbol
+    def lookup(self, tradingsymbol, exchange='NSE'):
+        i = self._index('symbol').get((exchange.encode('utf-8'), tradingsymbol.encode('utf-8')))
+        return None if i is None else self._row(i)
+
+    # Look up an instrument by its instrument token
+    def lookup_token(self, token):
+        i = self._index('token').get(int(token))
+        return None if i is None else self._row(i)
+
+    def token(self, tradingsymbol, exchange='NSE'):
+        i = self._index('symbol').get((exchange.encode('utf-8'), tradingsymbol.encode('utf-8')))
+        return None if i is None else int(self.table['instrument_token'][i])
+
+    # Row numbers of every instrument on an exchange / in a segment / of an instrument type
+    def rows(self, exchange=None, segment=None, instrument_type=None):
+        selected = None
+        for name, value in (('exchange', exchange), ('segment', segment), ('instrument_type', instrument_type)):
+            if value is None:
+                continue
+            matches = self._index(name).get(value.encode('utf-8'), np.zeros(0, dtype=np.intp))
+            selected = matches if selected is None else np.intersect1d(selected, matches, assume_unique=True)
+        if selected is None:
+            return np.arange(len(self.table))
+        return np.sort(selected)
+
+    # Filtered universe as {tradingsymbol: instrument_token}, e.g. universe('NSE', 'NSE', 'EQ', index='nifty500')
+    def universe(self, exchange='NSE', segment=None, instrument_type='EQ', symbols=None, index=None):
+        rows = self.rows(exchange, segment, instrument_type)
+        tradingsymbols = [s.decode('utf-8') for s in self.table['tradingsymbol'][rows].tolist()]
+        tokens = self.table['instrument_token'][rows].tolist()
+        wanted = None
+        if symbols is not None:
+            wanted = set(symbols)
+        if index is not None:
+            constituents = load_index_constituents(index)
+            wanted = constituents if wanted is None else wanted & constituents
+        return dict(
+            (symbol, token) for symbol, token in zip(tradingsymbols, tokens)
+            if wanted is None or symbol in wanted
+        )
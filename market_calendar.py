@@ -0,0 +1,136 @@
+import os
+import json
+from datetime import datetime, date, time, timedelta, timezone
+
+# India Standard Time has no daylight saving, so a fixed offset is exact
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Optional extra holidays, e.g. {"NSE": ["2027-01-26", ...]}, for years not listed below
+HOLIDAYS_FILE = 'market_holidays.json'
+
+# NSE equity segment trading holidays that fall on weekdays
+NSE_HOLIDAYS = [
+    # 2024
+    '2024-01-22', '2024-01-26', '2024-03-08', '2024-03-25', '2024-03-29', '2024-04-11',
+    '2024-04-17', '2024-05-01', '2024-05-20', '2024-06-17', '2024-07-17', '2024-08-15',
+    '2024-10-02', '2024-11-01', '2024-11-15', '2024-11-20', '2024-12-25',
+    # 2025
+    '2025-02-26', '2025-03-14', '2025-03-31', '2025-04-10', '2025-04-14', '2025-04-18',
+    '2025-05-01', '2025-08-15', '2025-08-27', '2025-10-02', '2025-10-21', '2025-10-22',
+    '2025-11-05', '2025-12-25',
+    # 2026 (01-15: Maharashtra municipal elections)
+    '2026-01-15', '2026-01-26', '2026-03-03', '2026-03-26', '2026-03-31', '2026-04-03',
+    '2026-04-14', '2026-05-01', '2026-05-28', '2026-06-26', '2026-09-14', '2026-10-02',
+    '2026-10-20', '2026-11-10', '2026-11-24', '2026-12-25',
+]
+
+# Session phases returned by ExchangeCalendar.phase()
+CLOSED = 'closed'
+WARMUP = 'warmup'
+OPEN = 'open'
+CLOSING = 'closing'
+
+
+# Function to read extra holidays for an exchange from HOLIDAYS_FILE
+def load_holidays(exchange, path=HOLIDAYS_FILE):
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get(exchange, [])
+    except json.JSONDecodeError:
+        print(f"Error reading holidays from {path}.")
+        return []
+
+
+class ExchangeCalendar:
+    # Trading sessions of one exchange. Without open/close times the exchange trades around the clock.
+
+    def __init__(self, name, tz=timezone.utc, open_time=None, close_time=None, weekdays=range(5), holidays=()):
+        self.name = name
+        self.tz = tz
+        self.open_time = open_time
+        self.close_time = close_time
+        self.weekdays = set(weekdays)
+        self.holidays = set(date.fromisoformat(day) for day in holidays)
+        self._checked_years = set()
+
+    @property
+    def always_open(self):
+        return self.open_time is None
+
+    def _now(self, now=None):
+        if now is None:
+            return datetime.now(self.tz)
+        if now.tzinfo is None:
+            return now.replace(tzinfo=self.tz)
+        return now.astimezone(self.tz)
+
+    # Warn once per year when no holidays are known for it, since every weekday would then count as a session
+    def _check_holidays(self, year):
+        if self.always_open or year in self._checked_years:
+            return
+        self._checked_years.add(year)
+        if not any(day.year == year for day in self.holidays):
+            print(f"Warning: no {self.name} holidays listed for {year}; add them to {HOLIDAYS_FILE}.")
+
+    def is_trading_day(self, day):
+        return day.weekday() in self.weekdays and day not in self.holidays
+
+    # (open, close) of the session on a day, or None if the exchange is shut that day
+    def session(self, day):
+        if self.always_open or not self.is_trading_day(day):
+            return None
+        return (
+            datetime.combine(day, self.open_time, tzinfo=self.tz),
+            datetime.combine(day, self.close_time, tzinfo=self.tz)
+        )
+
+    # The session in progress, or the next one to start
+    def next_session(self, now=None):
+        now = self._now(now)
+        self._check_holidays(now.year)
+        for days in range(15):
+            session = self.session(now.date() + timedelta(days=days))
+            if session is not None and session[1] > now:
+                return session
+        return None
+
+    # Where we are relative to the session: WARMUP in the window before the open,
+    # CLOSING once new entries should stop, CLOSED outside both.
+    def phase(self, now=None, warmup=timedelta(0), entry_cutoff=timedelta(0)):
+        if self.always_open:
+            return OPEN
+        now = self._now(now)
+        session = self.next_session(now)
+        if session is None:
+            return CLOSED
+        open_at, close_at = session
+        if now < open_at - warmup:
+            return CLOSED
+        if now < open_at:
+            return WARMUP
+        if now < close_at - entry_cutoff:
+            return OPEN
+        return CLOSING
+
+    # Seconds until the warm-up window of the next session starts (0 when it already has)
+    def seconds_until_warmup(self, now=None, warmup=timedelta(0)):
+        if self.always_open:
+            return 0
+        now = self._now(now)
+        session = self.next_session(now)
+        if session is None:
+            return 24 * 60 * 60
+        return max((session[0] - warmup - now).total_seconds(), 0)
+
+
+CALENDARS = {
+    'NSE': ExchangeCalendar('NSE', IST, time(9, 15), time(15, 30), holidays=NSE_HOLIDAYS + load_holidays('NSE')),
+    'CRYPTO': ExchangeCalendar('CRYPTO'),
+}
+
+
+# Function to get the calendar for an exchange ('NSE' for script.py, 'CRYPTO' for the crypto bots)
+def get_calendar(exchange):
+    return CALENDARS[exchange]
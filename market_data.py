@@ -0,0 +1,139 @@
+import time
+import threading
+import pandas as pd
+
+# Each update re-downloads this many seconds before the last candle so the forming bar is refreshed
+OVERLAP_SECONDS = 15 * 60
+
+
+class BarCache:
+    # Rolling per-symbol candle buffers. A symbol is downloaded in full once (warm-up);
+    # after that each update only fetches the candles since the last one it holds.
+
+    def __init__(self, fetch, days, time_column='timestamp', compute=None, min_rows=0, overlap=OVERLAP_SECONDS):
+        self.fetch = fetch  # fetch(symbol, days) -> DataFrame of candles
+        self.days = days
+        self.time_column = time_column
+        self.compute = compute  # e.g. calculate_indicators, applied whenever the candles change
+        self.min_rows = min_rows
+        self.overlap = overlap
+        self.frames = {}
+        self.versions = {}
+        self._warming = set()
+        self._lock = threading.Lock()
+
+    def is_ready(self, symbol):
+        with self._lock:
+            return symbol in self.frames
+
+    def get(self, symbol):
+        with self._lock:
+            return self.frames.get(symbol)
+
+    def version(self, symbol):
+        with self._lock:
+            return self.versions.get(symbol, 0)
+
+    def _fetch(self, symbol, days):
+        try:
+            return self.fetch(symbol, days)
+        except Exception as e:
+            print(f"Failed to fetch candles for {symbol}: {e}")
+            return None
+
+    def _warm(self, symbol):
+        df = self._fetch(symbol, self.days)
+        if df is None or df.empty:
+            print(f"Warm-up failed for {symbol}")
+            with self._lock:
+                self._warming.discard(symbol)
+            return None
+        print(f"Warmed {len(df)} candles for {symbol}")
+        return self._store(symbol, df)
+
+    # Download the full history for a symbol
+    def warm(self, symbol):
+        with self._lock:
+            self._warming.add(symbol)
+        return self._warm(symbol)
+
+    # Download the full history in a background thread so other symbols keep trading
+    def warm_async(self, symbol):
+        with self._lock:
+            if symbol in self._warming or symbol in self.frames:
+                return
+            self._warming.add(symbol)
+        threading.Thread(target=self._warm, args=(symbol,), name=f"warm-{symbol}", daemon=True).start()
+
+    # Fetch only the candles since the last one held and merge them into the buffer.
+    # Returns None for a symbol that is not warmed (or was dropped meanwhile); warming is left to the caller.
+    def update(self, symbol):
+        old = self.get(symbol)
+        if old is None:
+            return None
+
+        last = pd.Timestamp(old[self.time_column].iloc[-1])
+        gap = max(time.time() - last.timestamp(), 0) + self.overlap
+        new = self._fetch(symbol, gap / (24 * 60 * 60))
+        if new is None or new.empty:
+            return old
+
+        columns = list(new.columns)
+        merged = pd.concat([old[columns], new], ignore_index=True)
+        merged = merged.drop_duplicates(subset=self.time_column, keep='last')
+        merged = merged.sort_values(self.time_column)
+        cutoff = merged[self.time_column].iloc[-1] - pd.Timedelta(days=self.days)
+        merged = merged[merged[self.time_column] > cutoff].reset_index(drop=True)
+        if merged.equals(old[columns]):
+            return old
+        return self._store(symbol, merged)
+
+    def _store(self, symbol, df):
+        if self.compute is not None and len(df) >= self.min_rows:
+            df = self.compute(df)
+        with self._lock:
+            # The symbol may have been dropped while its candles were downloading
+            if symbol not in self.frames and symbol not in self._warming:
+                return None
+            self.frames[symbol] = df
+            self.versions[symbol] = self.versions.get(symbol, 0) + 1
+            self._warming.discard(symbol)
+        return df
+
+    # Forget a symbol and free its buffer
+    def drop(self, symbol):
+        with self._lock:
+            self.frames.pop(symbol, None)
+            self.versions.pop(symbol, None)
+            self._warming.discard(symbol)
+
+    # Drop every buffer whose symbol is not in symbols, e.g. restored ones no longer configured
+    def retain(self, symbols):
+        with self._lock:
+            stale = [symbol for symbol in self.frames if symbol not in symbols]
+        for symbol in stale:
+            self.drop(symbol)
+        return stale
+
+    # The current buffers, e.g. for writing a snapshot
+    def export(self):
+        with self._lock:
+            return dict(self.frames)
+
+    # Load buffers saved in a snapshot; ones whose last candle is outside the lookback window are ignored
+    def restore(self, frames):
+        restored = []
+        for symbol, df in frames.items():
+            if df.empty or self.time_column not in df.columns:
+                continue
+            last = pd.Timestamp(df[self.time_column].iloc[-1])
+            if time.time() - last.timestamp() > self.days * 24 * 60 * 60:
+                continue
+            # Indicators are recomputed so buffers saved by an older release get the current columns
+            if self.compute is not None and len(df) >= self.min_rows:
+                df = self.compute(df)
+            with self._lock:
+                self.frames[symbol] = df
+                self.versions[symbol] = self.versions.get(symbol, 0) + 1
+            restored.append(symbol)
+        return restored
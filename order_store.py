@@ -0,0 +1,172 @@
+import time
+import threading
+from collections import defaultdict
+
+# Order statuses that can still change on the exchange
+OPEN_STATUSES = ('OPEN', 'PARTIALLY_EXECUTED')
+
+# How far back the first sync looks for orders
+INITIAL_LOOKBACK_DAYS = 1
+
+
+class OrderStore:
+    # Local copy of exchange orders, synced incrementally and indexed by order_id, symbol and status
+
+    def __init__(self, make_request, exchange='coinswitchx', page_size=100, lookback_days=INITIAL_LOOKBACK_DAYS):
+        self.make_request = make_request
+        self.exchange = exchange
+        self.page_size = page_size
+        self.lookback_days = lookback_days
+        self.orders = {}
+        self.cursor = None
+        self._by_symbol = defaultdict(set)
+        self._by_status = defaultdict(set)
+        self._lock = threading.Lock()
+
+    # Fetch only orders created since the cursor, which sits at the newest order seen, then
+    # refresh the orders still open locally so their fills and cancellations are picked up.
+    def sync(self):
+        if self.cursor is None:
+            from_time = int(time.time() * 1000) - self.lookback_days * 24 * 60 * 60 * 1000
+        else:
+            from_time = self.cursor
+
+        orders = self._fetch_orders(from_time)
+        if orders is None:
+            return False
+        with self._lock:
+            for order in orders:
+                self._upsert(order)
+            self._advance_cursor(from_time)
+        return self._refresh_open()
+
+    # Fetch every order created since from_time, paging backwards while pages are full.
+    # Returns None if a request fails.
+    def _fetch_orders(self, from_time, open_only=False):
+        endpoint = "/trade/api/v2/orders"
+        fetched = []
+        to_time = None
+        while True:
+            params = {
+                "count": self.page_size,
+                "from_time": str(from_time),
+                "exchanges": self.exchange
+            }
+            if open_only:
+                params["open"] = True
+            if to_time:
+                params["to_time"] = str(to_time)
+
+            data = self.make_request("GET", endpoint, params=params)
+            if not data or 'data' not in data:
+                print("Failed to sync orders.")
+                return None
+
+            orders = data['data'].get('orders', []) if isinstance(data['data'], dict) else data['data']
+            fetched.extend(orders)
+
+            # A full page means there may be older orders in the window; page backwards by created_time
+            if len(orders) < self.page_size:
+                break
+            oldest = min(int(order['created_time']) for order in orders)
+            if oldest == to_time or oldest <= from_time:
+                break
+            to_time = oldest
+        return fetched
+
+    # Re-read the orders tracked as open: one open=True listing covers those still open,
+    # the ones missing from it have finished and are fetched individually for their final state.
+    def _refresh_open(self):
+        tracked = self.open_orders()
+        if not tracked:
+            return True
+
+        from_time = min(int(order['created_time']) for order in tracked)
+        still_open = self._fetch_orders(from_time, open_only=True)
+        if still_open is None:
+            return False
+        listed = set(order['order_id'] for order in still_open)
+        finished = []
+        for order in tracked:
+            if order['order_id'] in listed:
+                continue
+            data = self.make_request("GET", "/trade/api/v2/order", params={"order_id": order['order_id']})
+            if data and isinstance(data.get('data'), dict) and data['data'].get('order_id'):
+                finished.append(data['data'])
+            else:
+                print(f"Failed to fetch order {order['order_id']}.")
+
+        with self._lock:
+            for order in still_open + finished:
+                self._upsert(order)
+        return True
+
+    def _upsert(self, order):
+        order_id = order['order_id']
+        previous = self.orders.get(order_id)
+        if previous is not None:
+            self._by_symbol[previous['symbol'].upper()].discard(order_id)
+            self._by_status[previous['status'].upper()].discard(order_id)
+        self.orders[order_id] = order
+        self._by_symbol[order['symbol'].upper()].add(order_id)
+        self._by_status[order['status'].upper()].add(order_id)
+
+    def _advance_cursor(self, from_time):
+        created = [int(order['created_time']) for order in self.orders.values()]
+        self.cursor = max(created + [from_time])
+
+    def get(self, order_id):
+        with self._lock:
+            return self.orders.get(order_id)
+
+    # Orders filtered by symbol and/or status, answered from the local indexes
+    def query(self, symbol=None, status=None):
+        with self._lock:
+            ids = None
+            if symbol is not None:
+                ids = set(self._by_symbol.get(symbol.upper(), ()))
+            if status is not None:
+                statuses = [status] if isinstance(status, str) else status
+                matches = set()
+                for s in statuses:
+                    matches |= self._by_status.get(s.upper(), set())
+                ids = matches if ids is None else ids & matches
+            if ids is None:
+                ids = self.orders.keys()
+            return [self.orders[order_id] for order_id in ids]
+
+    def open_orders(self, symbol=None):
+        return self.query(symbol=symbol, status=OPEN_STATUSES)
+
+    # Bring a position in line with its entry order: drop it if the order closed unfilled,
+    # otherwise use the executed quantity and average price. Returns None when dropped.
+    def reconcile_position(self, position):
+        order = self.get(position.get('order_id'))
+        if order is None:
+            return position
+
+        executed = float(order.get('executed_qty') or 0)
+        if executed == 0:
+            if order['status'].upper() in OPEN_STATUSES:
+                return position
+            return None
+
+        position['quantity'] = executed
+        if order.get('average_price'):
+            position['entry_price'] = float(order['average_price'])
+        return position
+
+    # Orders and cursor as plain data, e.g. for writing a snapshot
+    def to_dict(self):
+        with self._lock:
+            return {'cursor': self.cursor, 'orders': list(self.orders.values())}
+
+    # Load orders saved by to_dict(); the next sync continues from the saved cursor
+    def load_dict(self, state):
+        with self._lock:
+            self.orders = {}
+            self._by_symbol = defaultdict(set)
+            self._by_status = defaultdict(set)
+            for order in state.get('orders', []):
+                self._upsert(order)
+            self.cursor = state.get('cursor')
@@ -1,9 +1,15 @@
 import time
 import pandas as pd
-import pandas_ta as ta
 import os
 from datetime import datetime, timedelta
 from kiteconnect import KiteConnect, KiteTicker
+from instruments import InstrumentMaster
+from market_data import BarCache
+from indicators import calculate_indicators
+from signals import entry_signal, exit_signal
+from control import BotConfig, start_control_server
+from snapshot import save_snapshot, load_snapshot
+from market_calendar import get_calendar, CLOSED, WARMUP, OPEN
 
 # Replace with your API Key and Secret
 api_key = ""
@@ -11,9 +17,20 @@ api_secret = ""
 
 POSITIONS_FILE = 'zerodha.json'
 
+# Port of the local control API used to change stocks and parameters while the bot runs
+CONTROL_PORT = 5003
+
+# NSE sessions: candles are warmed this long before the open and new entries stop this long before the close
+exchange_calendar = get_calendar('NSE')
+WARMUP_WINDOW = timedelta(minutes=15)
+ENTRY_CUTOFF = timedelta(minutes=15)
+
 # Initialize KiteConnect
 kite = KiteConnect(api_key=api_key)
 
+# Daily instrument master used to resolve tradingsymbols to instrument tokens
+instruments = InstrumentMaster(kite)
+
 import json
 
 def generate_kite_session():
@@ -57,7 +74,6 @@ def set_kite_access_token():
         print("Error reading session data from zerodhaSession.json.")
 
 
-
 # def generate_kite_session():
 #     print("Please generate your access token:")
 #     print(f"Login URL: {kite.login_url()}")
@@ -72,14 +88,51 @@ def set_kite_access_token():
 
 # generate_kite_session()
 
-# List of stocks to trade with their respective instrument tokens
-stocks = {
-    'YESBANK': 3050241,
-    'TATAMOTORS':884737,
-    'ICICIBANK':1270529,
-    'EICHERMOT':232961,
-    'BATAINDIA':128011012
-}
+# List of stocks to trade; instrument tokens are resolved from the instrument master
+STOCK_SYMBOLS = ['YESBANK', 'TATAMOTORS', 'ICICIBANK', 'EICHERMOT', 'BATAINDIA']
+
+# Set to an NSE index such as 'nifty500' to trade every NSE EQ constituent instead
+STOCK_INDEX = None
+
+
+# Function to resolve the tradable universe against today's instrument master
+def resolve_stocks():
+    if STOCK_INDEX:
+        resolved = instruments.universe(exchange='NSE', segment='NSE', instrument_type='EQ', index=STOCK_INDEX)
+    else:
+        resolved = instruments.universe(exchange='NSE', segment='NSE', instrument_type='EQ', symbols=STOCK_SYMBOLS)
+        for symbol in STOCK_SYMBOLS:
+            if symbol not in resolved:
+                print(f"No NSE instrument found for {symbol}")
+    return resolved
+
+
+# Function to look up the instrument token of a stock added through the control API
+def resolve_instrument(symbol, settings):
+    if 'token' not in settings:
+        token = instruments.token(symbol, 'NSE')
+        if token is None:
+            raise ValueError(f"No NSE instrument found for {symbol}")
+        settings['token'] = token
+    try:
+        settings['token'] = int(settings['token'])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid token: {settings['token']}")
+    return settings
+
+
+# Live configuration; stocks are added once the instrument master is available
+config = BotConfig(
+    {},
+    {
+        'quantity': 10,
+        'target_multiplier': 1.2,
+        'stop_multiplier': 0.95
+    },
+    resolve=resolve_instrument,
+    in_use=lambda symbol: symbol in load_positions(),
+    seed={'symbols': STOCK_SYMBOLS, 'index': STOCK_INDEX}
+)
 
 # Positions dictionary to keep track of open positions
 # positions = {}
@@ -128,62 +181,123 @@ def place_order(tradingsymbol, transaction_type, quantity):
     except Exception as e:
         print(f"Failed to place order: {e}")
 
-# Function to calculate technical indicators
+# Function to fetch candles for a configured stock
 
 
-def calculate_indicators(df):
-    # DEMA (Double Exponential Moving Average)
-    df['DEMA_200'] = ta.dema(df['close'], length=200)
+def fetch_bars(symbol, days):
+    settings = config.instrument(symbol)
+    if settings is None:
+        return pd.DataFrame()
+    return get_historical_data(settings['token'], days=days)
 
-    # MACD
-    macd = ta.macd(df['close'], fast=12, slow=26, signal=9)
-    df['MACD'] = macd['MACD_12_26_9']
-    df['MACD_signal'] = macd['MACDs_12_26_9']
 
-    # Supertrend
-    supertrend = ta.supertrend(
-        df['high'], df['low'], df['close'], length=7, multiplier=3.0)
-    df['Supertrend'] = supertrend['SUPERT_7_3.0']
+# Candle buffers with indicators; only new candles are downloaded after warm-up
+bars = BarCache(fetch_bars, days=5, time_column='date', compute=calculate_indicators, min_rows=200)
+
+config.on_add(bars.warm_async)
+config.on_remove(bars.drop)
+
+# Live state snapshot used for fast warm restarts
+SNAPSHOT_FILE = 'zerodha.snapshot'
+SNAPSHOT_INTERVAL = 30  # Seconds between snapshots
+
+
+# Function to write candle buffers with indicators and config to the snapshot
+def save_state():
+    try:
+        save_snapshot(SNAPSHOT_FILE, bars.export(), {
+            'config': config.to_dict()
+        })
+    except Exception as e:
+        print(f"Failed to write snapshot: {e}")
+
+
+# Function to restore the snapshot; only candles after it are downloaded on the next update
+def restore_state():
+    snapshot = load_snapshot(SNAPSHOT_FILE)
+    if snapshot is None:
+        return False
+    state = snapshot['state']
+    restored = bars.restore(snapshot['frames'])
+    config.restore(state.get('config', {}))
+    # Buffers of symbols that are no longer configured would never be updated or freed
+    stale = bars.retain(config.symbols())
+    print(f"Restored {len(restored) - len(stale)} candle buffers from {SNAPSHOT_FILE} ({time.time() - snapshot['created']:.0f}s old)")
+    return True
 
-    return df
 
 # Main trading loop
 
 
 def trading_bot():
+    stocks_loaded = restore_state() and bool(config.symbols())
+    start_control_server(config, CONTROL_PORT)
+    last_snapshot = time.time()
+
     while True:
+        # Sleep through the night, weekends and holidays; wake up for the pre-open warm-up
+        phase = exchange_calendar.phase(warmup=WARMUP_WINDOW, entry_cutoff=ENTRY_CUTOFF)
+        if phase == CLOSED:
+            save_state()
+            wait = exchange_calendar.seconds_until_warmup(warmup=WARMUP_WINDOW)
+            print(f"NSE is closed, sleeping {wait / 3600:.1f} hours until the pre-open warm-up")
+            time.sleep(wait)
+            continue
+
         positions = load_positions()
         set_kite_access_token()
+        # Tokens are re-resolved whenever a new instrument master is downloaded, since they can change.
+        # Nothing is resolved while no master is available; its download is retried after a backoff.
+        if (instruments.refresh() or not stocks_loaded) and instruments.available:
+            if stocks_loaded:
+                # After the first load only the stocks being traded get new tokens, so stocks
+                # removed through the control API are not brought back from STOCK_SYMBOLS
+                resolved = {}
+                for symbol in config.symbols():
+                    token = instruments.token(symbol, 'NSE')
+                    if token is None:
+                        print(f"No NSE instrument found for {symbol}")
+                    else:
+                        resolved[symbol] = token
+            else:
+                resolved = resolve_stocks()
+                stocks_loaded = bool(resolved)
+            for symbol, token in resolved.items():
+                config.add_instrument(symbol, {'token': token})
         current_time = datetime.now()
         if current_time.second % 10 == 0:  # Run every 5 minutes
-            for symbol, token in stocks.items():
+            for symbol in config.symbols():
+                if not bars.is_ready(symbol):
+                    print(f"Waiting for {symbol} to warm up")
+                    bars.warm_async(symbol)
+                    continue
+
                 print(f"Processing stock: {symbol}")
-                df = get_historical_data(token)
-                df = calculate_indicators(df)
+                df = bars.update(symbol)
+
+                # Before the open only the candles and indicators are brought up to date
+                if phase == WARMUP:
+                    continue
 
                 # Ensure we have enough data points
-                if len(df) < 200:
+                if df is None or len(df) < 200:
                     print(f"Not enough data for {symbol}")
                     continue
 
                 # Get the latest data point
                 latest = df.iloc[-1]
-                previous = df.iloc[-2]
 
                 # Entry Conditions
                 if symbol not in positions:
-                    entry_condition = (
-                        latest['close'] > latest['DEMA_200'] and
-                        previous['MACD'] < previous['MACD_signal'] and
-                        latest['MACD'] > latest['MACD_signal']
-                    )
-                    if entry_condition:
+                    # No new entries once the entry cutoff before the close has passed
+                    if entry_signal(df) and phase == OPEN:
                         # Place Buy Order
 
-                        place_order(symbol, kite.TRANSACTION_TYPE_BUY, 10)
+                        quantity = config.param('quantity')
+                        place_order(symbol, kite.TRANSACTION_TYPE_BUY, quantity)
                         positions[symbol] = {
                             'entry_price': latest['close'],
-                            'quantity': 10,
+                            'quantity': quantity,
                             'entry_time': current_time
                         }
                         save_positions(positions)
@@ -193,24 +307,19 @@ def trading_bot():
                 # Exit Conditions
                 else:
                     position = positions[symbol]
-                    entry_price = position['entry_price']
-                    target_price = entry_price * 1.2  # Target Profit of 20%
-                    stop_loss_price = entry_price * 0.95  # Stop Loss of 5%
-
-                    exit_condition = (
-                        (previous['close'] > previous['Supertrend'] and latest['close'] < latest['Supertrend']) or
-                        latest['close'] <= stop_loss_price or
-                        latest['close'] >= target_price
-                    )
-
-                    if exit_condition:
+                    if exit_signal(df, position['entry_price'], config.param('target_multiplier'),
+                                   config.param('stop_multiplier')):
                         # Place Sell Order
-                        place_order(symbol, kite.TRANSACTION_TYPE_SELL, 10)
+                        place_order(symbol, kite.TRANSACTION_TYPE_SELL, position['quantity'])
                         print(
                             f"Exited position for {symbol} at {latest['close']}")
                         del positions[symbol]
                         save_positions(positions)
 
+            # Snapshot the live state for a fast warm restart
+            if time.time() - last_snapshot >= SNAPSHOT_INTERVAL:
+                save_state()
+                last_snapshot = time.time()
 
             # Sleep until the next 5-minute interval
             time.sleep(10 - datetime.now().second % 10)
@@ -224,6 +333,7 @@ if __name__ == "__main__":
     try:
         trading_bot()
     except KeyboardInterrupt:
+        save_state()
         print("Trading bot stopped manually.")
     except Exception as e:
         print(f"An error occurred: {e}")
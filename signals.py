@@ -0,0 +1,27 @@
+# Entry and exit rules of the DEMA/MACD/Supertrend strategy, shared by every bot.
+# df holds candles with the columns added by indicators.calculate_indicators.
+
+
+# Function to check for an entry on the latest candle: close above the DEMA while MACD crosses above its signal
+def entry_signal(df):
+    latest = df.iloc[-1]
+    previous = df.iloc[-2]
+    return bool(
+        latest['close'] > latest['DEMA'] and
+        previous['MACD'] < previous['MACD_signal'] and
+        latest['MACD'] > latest['MACD_signal']
+    )
+
+
+# Function to check for an exit on the latest candle: close crossing below the Supertrend,
+# or the stop loss / target (entry price times the multipliers) being reached
+def exit_signal(df, entry_price, target_multiplier, stop_multiplier):
+    latest = df.iloc[-1]
+    previous = df.iloc[-2]
+    target_price = entry_price * target_multiplier
+    stop_loss_price = entry_price * stop_multiplier
+    return bool(
+        (previous['close'] > previous['Supertrend'] and latest['close'] < latest['Supertrend']) or
+        latest['close'] <= stop_loss_price or
+        latest['close'] >= target_price
+    )
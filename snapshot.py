@@ -0,0 +1,135 @@
+import os
+import json
+import mmap
+import time
+import struct
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+
+# File layout: magic, header length, JSON header, then one 64-byte aligned block per column
+SNAPSHOT_MAGIC = b'ATSNAP01'
+ALIGNMENT = 64
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Function to describe a timezone so it can be rebuilt on restore
+def _tz_spec(tz):
+    name = getattr(tz, 'zone', None) or getattr(tz, 'key', None)
+    if name:
+        return {'name': name}
+    return {'offset': tz.utcoffset(datetime.now()).total_seconds()}
+
+
+def _tz_from_spec(spec):
+    if 'name' in spec:
+        return spec['name']
+    return timezone(timedelta(seconds=spec['offset']))
+
+
+# Function to split a DataFrame into raw column arrays plus the metadata to rebuild it
+def _frame_columns(df):
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        column = {'name': str(name), 'kind': 'values'}
+        if pd.api.types.is_datetime64tz_dtype(series.dtype):
+            values = series.dt.tz_convert('UTC').dt.tz_localize(None).values.astype('M8[ns]').view('i8')
+            column['kind'] = 'datetime'
+            column['tz'] = _tz_spec(series.dt.tz)
+        elif pd.api.types.is_datetime64_dtype(series.dtype):
+            values = series.values.astype('M8[ns]').view('i8')
+            column['kind'] = 'datetime'
+        elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            values = series.values
+        else:
+            # Object columns are not part of the bar buffers; skip rather than pickle them
+            continue
+        values = np.ascontiguousarray(values)
+        column['dtype'] = values.dtype.str
+        columns.append((column, values))
+    return columns
+
+
+# Function to write a snapshot of DataFrames and JSON state atomically (temp file + rename)
+def save_snapshot(path, frames, state):
+    frames_meta = {}
+    blocks = []
+    offset = 0
+    for key, df in frames.items():
+        columns = []
+        for column, values in _frame_columns(df):
+            offset = _align(offset)
+            column['offset'] = offset
+            columns.append(column)
+            blocks.append((offset, values))
+            offset += values.nbytes
+        frames_meta[key] = {'rows': len(df), 'columns': columns}
+
+    header = json.dumps({
+        'created': time.time(),
+        'state': state,
+        'frames': frames_meta
+    }, default=str).encode('utf-8')
+    data_start = _align(len(SNAPSHOT_MAGIC) + 8 + len(header))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for block_offset, values in blocks:
+            f.seek(data_start + block_offset)
+            f.write(values.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# Function to read a snapshot by memory-mapping it; returns None if it is missing or unreadable
+def load_snapshot(path):
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        print(f"Failed to open snapshot {path}: {e}")
+        return None
+
+    try:
+        if mm[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            print(f"{path} is not a snapshot file")
+            return None
+        header_start = len(SNAPSHOT_MAGIC) + 8
+        (header_length,) = struct.unpack('<Q', mm[len(SNAPSHOT_MAGIC):header_start])
+        header = json.loads(mm[header_start:header_start + header_length].decode('utf-8'))
+        data_start = _align(header_start + header_length)
+
+        frames = {}
+        for key, meta in header['frames'].items():
+            rows = meta['rows']
+            data = {}
+            for column in meta['columns']:
+                dtype = np.dtype(column['dtype'])
+                if rows:
+                    values = np.frombuffer(mm, dtype=dtype, count=rows, offset=data_start + column['offset']).copy()
+                else:
+                    values = np.empty(0, dtype=dtype)
+                if column['kind'] == 'datetime':
+                    values = pd.to_datetime(values, unit='ns')
+                    if 'tz' in column:
+                        values = values.tz_localize('UTC').tz_convert(_tz_from_spec(column['tz']))
+                data[column['name']] = values
+            frames[key] = pd.DataFrame(data, columns=[column['name'] for column in meta['columns']])
+    except Exception as e:
+        print(f"Failed to read snapshot {path}: {e}")
+        return None
+    finally:
+        mm.close()
+
+    return {'created': header['created'], 'state': header['state'], 'frames': frames}
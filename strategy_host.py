@@ -0,0 +1,203 @@
+import os
+import json
+import time
+from datetime import datetime
+
+import crypto
+from indicators import DEFAULT_INDICATORS, calculate_indicators, indicator_key
+from signals import entry_signal, exit_signal
+from market_data import BarCache
+
+# Strategy variants run by the host. Each one mirrors a standalone bot; variants that use the
+# same (symbol, interval, indicators) share one candle download and one indicator pass.
+# Positions are kept in positions_<name>.json unless a variant names its own positions_file.
+STRATEGIES = [
+    {
+        'name': 'crypto',
+        'quantities': {"BTC/INR": 0.0001, "ETH/INR": 0.001},
+        'interval': 5,
+        'days': 2,
+        'every': 10,
+        'indicators': DEFAULT_INDICATORS,
+        'target_multiplier': 1.10,
+        'stop_multiplier': 0.95
+    },
+    {
+        'name': 'crypto2',
+        'quantities': {"BTC/INR": 0.00001, "ETH/INR": 0.001},
+        'positions_file': 'crypto_position.json',  # Same file as crypto2.py, so its open positions carry over
+        'interval': 5,
+        'days': 4,
+        'every': 60,
+        'indicators': DEFAULT_INDICATORS,
+        'target_multiplier': 1.02,
+        'stop_multiplier': 0.98
+    },
+]
+
+
+# Function to download candles for the hub
+def fetch_candles(symbol, interval, days):
+    return crypto.get_historical_data(symbol, exchange='coinswitchx', interval=interval, days=days)
+
+
+class MarketDataHub:
+    # Shared candle buffers per (symbol, interval) and indicator frames per (symbol, interval, indicators).
+    # Buffers keep the longest lookback any subscriber asked for.
+
+    def __init__(self, fetch=fetch_candles):
+        self.fetch = fetch
+        self.caches = {}
+        self.settings = {}
+        self._frames = {}
+
+    def _cache(self, interval):
+        if interval not in self.caches:
+            self.caches[interval] = BarCache(
+                lambda symbol, days: self.fetch(symbol, interval, days),
+                days=0
+            )
+        return self.caches[interval]
+
+    # Register interest in a symbol; returns the indicator key to read frames with
+    def subscribe(self, symbol, interval, days, indicators):
+        cache = self._cache(interval)
+        cache.days = max(cache.days, days)
+        key = indicator_key(indicators)
+        self.settings[key] = dict(key)
+        return key
+
+    # Bring the given (symbol, interval) buffers up to date with one request each
+    def update(self, streams):
+        for symbol, interval in streams:
+            cache = self.caches[interval]
+            if not cache.is_ready(symbol):
+                cache.warm_async(symbol)
+            else:
+                cache.update(symbol)
+
+    # Candles with indicators, computed at most once per new candle for each indicator key
+    def frame(self, symbol, interval, key):
+        cache = self.caches[interval]
+        bars = cache.get(symbol)
+        if bars is None:
+            return None
+
+        version = cache.version(symbol)
+        cached = self._frames.get((symbol, interval, key))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        df = calculate_indicators(bars.copy(), **self.settings[key])
+        self._frames[(symbol, interval, key)] = (version, df)
+        return df
+
+
+class Strategy:
+    # One DEMA/MACD/Supertrend configuration with its own quantities, exits and positions file
+
+    def __init__(self, settings, hub):
+        self.name = settings['name']
+        self.quantities = dict(settings['quantities'])
+        self.interval = settings['interval']
+        self.every = settings['every']
+        self.target_multiplier = settings['target_multiplier']
+        self.stop_multiplier = settings['stop_multiplier']
+        self.min_rows = dict(indicator_key(settings['indicators']))['dema_length']
+        self.positions_file = settings.get('positions_file', f"positions_{self.name}.json")
+        self.positions = self.load_positions()
+        self.last_run = 0
+        self.hub = hub
+        self.keys = dict(
+            (symbol, hub.subscribe(symbol, self.interval, settings['days'], settings['indicators']))
+            for symbol in self.quantities
+        )
+
+    def load_positions(self):
+        if os.path.exists(self.positions_file):
+            with open(self.positions_file, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def save_positions(self):
+        with open(self.positions_file, 'w') as f:
+            json.dump(self.positions, f, indent=4)
+
+    def streams(self):
+        return [(symbol, self.interval) for symbol in self.quantities]
+
+    def is_due(self, now):
+        return now - self.last_run >= self.every
+
+    def run(self, current_time):
+        self.last_run = time.time()
+        for symbol, quantity in self.quantities.items():
+            df = self.hub.frame(symbol, self.interval, self.keys[symbol])
+            if df is None or len(df) < self.min_rows:
+                print(f"[{self.name}] Not enough data for {symbol}")
+                continue
+
+            # Get the latest data point
+            latest = df.iloc[-1]
+
+            # Entry Conditions
+            if symbol not in self.positions:
+                if entry_signal(df):
+                    order_id = crypto.place_order(symbol, 'BUY', quantity, price=latest['close'])
+                    if order_id:
+                        self.positions[symbol] = {
+                            'entry_price': latest['close'],
+                            'quantity': quantity,
+                            'entry_time': current_time.isoformat(),
+                            'order_id': order_id
+                        }
+                        self.save_positions()
+                        print(f"[{self.name}] Entered position for {symbol} at {latest['close']}")
+
+            # Exit Conditions
+            else:
+                before = dict(self.positions[symbol])
+                position = crypto.order_store.reconcile_position(self.positions[symbol])
+                if position is None:
+                    print(f"[{self.name}] Entry order for {symbol} closed unfilled, dropping position")
+                    del self.positions[symbol]
+                    self.save_positions()
+                    continue
+                if position != before:
+                    self.save_positions()  # Keep the filled quantity and price across restarts
+                if exit_signal(df, position['entry_price'], self.target_multiplier, self.stop_multiplier):
+                    order_id = crypto.place_order(symbol, 'SELL', position['quantity'], price=latest['close'])
+                    if order_id:
+                        print(f"[{self.name}] Exited position for {symbol} at {latest['close']}")
+                        del self.positions[symbol]
+                        self.save_positions()
+
+
+# Main loop: one order sync and one candle update per stream, shared by every due strategy
+def run_host(strategies=STRATEGIES):
+    hub = MarketDataHub()
+    hosted = [Strategy(settings, hub) for settings in strategies]
+    for strategy in hosted:
+        for symbol, interval in strategy.streams():
+            crypto.book_ticker.add_symbol(symbol)
+    crypto.book_ticker.start()
+    hub.update(set(stream for strategy in hosted for stream in strategy.streams()))
+
+    while True:
+        due = [strategy for strategy in hosted if strategy.is_due(time.time())]
+        if due:
+            current_time = datetime.now()
+            crypto.order_store.sync()
+            hub.update(set(stream for strategy in due for stream in strategy.streams()))
+            for strategy in due:
+                strategy.run(current_time)
+        time.sleep(1)
+
+
+if __name__ == "__main__":
+    try:
+        run_host()
+    except KeyboardInterrupt:
+        print("Strategy host stopped manually.")
+    except Exception as e:
+        print(f"An error occurred: {e}")